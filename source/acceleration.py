@@ -0,0 +1,149 @@
+ACCELERATIONS = ("sor", "aitken")
+
+
+def convergence_rate(x0, x1, x2) -> float:
+    """Signed convergence rate estimated from three consecutive iterates
+
+    Projection of the last change on the previous one. It is negative when
+    the values oscillate between sweeps, as in Pig where the value of a state
+    is one minus the value of the opponent.
+    """
+    num = den = 0.0
+    for a, b, c in zip(x0, x1, x2):
+        d1 = b - a
+        num += d1 * (c - b)
+        den += d1 * d1
+    return num / den if den > 0 else 0.0
+
+
+def aitken(x0, x1, x2, out, rate_min: float = -0.99, rate_max: float = 0.5):
+    """Componentwise Aitken extrapolation of three consecutive iterates
+
+    Every value is moved to the limit of the geometric sequence through its
+    last three iterates, x2 + r / (1 - r) * (x2 - x1) with r the ratio of the
+    last two changes, clipped to [rate_min, rate_max]. The result is written
+    to out and kept inside [0, 1]. Ratios of oscillating values (Pig) are
+    reliable, while those of monotone values drift (Piglet), so the default
+    rate_max limits their step to one more change.
+    """
+    for p, (a, b, c) in enumerate(zip(x0, x1, x2)):
+        d1 = b - a
+        d2 = c - b
+        if d1 == 0.0:
+            out[p] = c
+            continue
+        r = min(rate_max, max(rate_min, d2 / d1))
+        out[p] = min(1.0, max(0.0, c + r / (1.0 - r) * d2))
+
+
+class Accelerator():
+    """Safeguarded acceleration of value iteration sweeps
+
+    The solver runs a sweep with the relaxation factor `omega`, then hands the
+    values and the largest Bellman change of the sweep to `update`, which
+    returns the values to continue from.
+
+    - "sor": every backup is relaxed, V <- V + omega * (backup - V). With
+      omega=None the solver runs plain sweeps until the signed convergence
+      rate has settled (at least `WARMUP`, at most `WARMUP_MAX` sweeps), then
+      picks a factor of `OMEGA_TUNED`: values oscillating between the players
+      (Pig) are under-relaxed and monotone ones (Piglet) over-relaxed. The
+      factor is kept until the largest change stops decreasing over `WINDOW`
+      sweeps, when it moves halfway back to 1 (plain sweeps once close to 1).
+    - "aitken": after `period` plain sweeps the values are extrapolated with
+      `aitken`. If the next sweep changes the values more than the sweep
+      before the extrapolation, it is undone and the period doubled. After
+      `MAX_REJECTIONS` rejections in a row the solver runs plain sweeps.
+
+    Rejected sweeps are still sweeps, so the `iter` of the solver stays
+    comparable with a plain run.
+
+    Args:
+        method (str | None): "sor", "aitken" or None for plain sweeps
+        omega (float | None, optional): Relaxation factor, only for "sor". Defaults to None (auto-tuned).
+        period (int, optional): Plain sweeps between extrapolations. Defaults to 3.
+    """
+    __slots__ = ("method", "omega", "period", "_tune", "_history", "_deltas",
+                 "_backup", "_count", "_rejections")
+
+    WARMUP = 6
+    WARMUP_MAX = 20
+    RATE_SETTLED = 0.5
+    # Tuned factors for oscillating and monotone values
+    OMEGA_TUNED = (0.97, 1.1)
+    WINDOW = 5
+    MAX_REJECTIONS = 2
+
+    def __init__(self, method: str | None = None, omega: float | None = None, period: int = 3):
+        if method is not None and method not in ACCELERATIONS:
+            raise ValueError(f"Unknown acceleration {method!r}, expected one of {ACCELERATIONS}")
+        if omega is not None and method != "sor":
+            raise ValueError(f"The relaxation factor omega needs accel='sor', got accel={method!r}")
+        if omega is not None and not (0 < omega < 2):
+            raise ValueError(f"Value {omega} is out of range (0, 2)")
+        if period < 3:
+            raise ValueError(f"Aitken extrapolation needs a period of at least 3, got {period}")
+        self.method = method
+        self.omega = 1.0 if omega is None else omega
+        self.period = period
+        self._tune = method == "sor" and omega is None
+        self._history = []
+        self._deltas = []
+        self._backup = None
+        self._count = 0
+        self._rejections = 0
+
+    def update(self, values, delta: float):
+        """Values to continue from after a sweep with largest change delta"""
+        if self.method == "sor":
+            values = self._update_sor(values, delta)
+        elif self.method == "aitken":
+            values = self._update_aitken(values, delta)
+        return values
+
+    def _update_sor(self, values, delta: float):
+        self._count += 1
+        if self._tune:
+            # Plain sweeps until the signed rate leaves the initial transient
+            self._history = (self._history + [values[:]])[-3:]
+            if self._count >= self.WARMUP:
+                rate = convergence_rate(*self._history)
+                if abs(rate) >= self.RATE_SETTLED:
+                    self.omega = self.OMEGA_TUNED[rate > 0]
+                if abs(rate) >= self.RATE_SETTLED or self._count >= self.WARMUP_MAX:
+                    self._tune = False
+                    self._history = []
+        elif self.omega != 1.0:
+            self._deltas = (self._deltas + [delta])[-self.WINDOW - 1:]
+            if len(self._deltas) > self.WINDOW and delta >= self._deltas[0]:
+                # No progress over WINDOW sweeps, move back towards plain sweeps
+                self.omega = 1.0 + (self.omega - 1.0) / 2
+                if abs(self.omega - 1.0) < 0.01:
+                    self.omega = 1.0
+                self._deltas = []
+        return values
+
+    def _update_aitken(self, values, delta: float):
+        if self._backup is not None:
+            backup, backup_delta = self._backup
+            self._backup = None
+            if delta > backup_delta:
+                self._rejections += 1
+                if self._rejections >= self.MAX_REJECTIONS:
+                    # Extrapolation keeps failing, fall back to plain sweeps
+                    self.method = None
+                self.period *= 2
+                self._count = 0
+                self._history = []
+                return backup
+            self._rejections = 0
+        self._count += 1
+        self._history.append(values[:])
+        if len(self._history) > 3:
+            del self._history[0]
+        if self._count >= self.period:
+            self._backup = (self._history[-1], delta)
+            aitken(*self._history, values)
+            self._count = 0
+            self._history = []
+        return values
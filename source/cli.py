@@ -0,0 +1,170 @@
+"""Command line tools for solving, simulating and plotting Pig
+
+Usage:
+    python source/cli.py solve --T 100 --tol 1e-6
+    python source/cli.py simulate --T 100 -n 5000 -o simulation.csv
+    python source/cli.py tournament --T 100 -n 10000 -o tournament.json
+    python source/cli.py plot policy --T 100 -o policy.html
+    python source/cli.py sweep --variants pig piglet --targets 2-40 --workers 8
+
+Solved games are stored in a result directory (`--results`) and reused by
+every command, so only the first call for a given target pays for value
+iteration. Plotly and numpy are imported only by the commands that need them.
+"""
+import argparse
+import csv
+import json
+import sys
+
+PLOTS = ("policy", "reachable", "contours", "cross-section", "cross-sections", "convergence")
+
+
+def _add_game_arguments(parser: argparse.ArgumentParser, T: int = 100, tol: float = 1e-6,
+                        T_help: str | None = None):
+    parser.add_argument("--T", type=int, default=T, help=T_help or f"target score (default: {T})")
+    parser.add_argument("--tol", type=float, default=tol, help=f"value iteration tolerance (default: {tol:g})")
+    parser.add_argument("--iter-max", type=int, default=1000, help="maximum number of iterations (default: 1000)")
+    parser.add_argument("--results", default="results", help="directory of solved games (default: results)")
+
+
+def _solved(args, variant: str = "pig", trace: bool = False):
+    from store import load_or_solve
+    return load_or_solve(variant, args.T, args.tol, args.results, iter_max=args.iter_max, trace=trace)
+
+
+def solve(args):
+    """Solve a game and store the result"""
+    from store import load_or_solve, result_path
+    res = load_or_solve(args.variant, args.T, args.tol, args.results,
+                        iter_max=args.iter_max, force=args.force)
+    print(f"{result_path(args.results, args.variant, args.T, args.tol)}: "
+          f"iter={res.iter} converge={res.converge} V(0,0,0)={res.V[0, 0, 0]:.6f}")
+
+
+def simulate(args):
+    """Average turns and margin of victory for every starting score"""
+    from simulation import simulate_many
+    res = _solved(args)
+    avg_turns, avg_margin = simulate_many(res, n=args.n)
+    with open(args.output, "w", newline="") as f:
+        writer = csv.writer(f)
+        writer.writerow(["start_score", "avg_turns", "avg_margin"])
+        for i, (t, m) in enumerate(zip(avg_turns, avg_margin)):
+            writer.writerow([i, t, m])
+    print(args.output)
+
+
+def tournament(args):
+    """Win probabilities of the optimal policy against itself and hold at 20"""
+    from simulation import tournament as run_tournament
+    res = _solved(args)
+    probs = run_tournament(args.n, res)
+    keys = ("optimal_vs_optimal", "optimal_vs_hold20", "hold20_vs_optimal")
+    with open(args.output, "w") as f:
+        json.dump({"T": res.T, "n": args.n, **dict(zip(keys, probs))}, f, indent=2)
+    print(args.output)
+
+
+def plot(args):
+    """Write one of the figures of the report to a file"""
+    import visualisation as vis
+    if args.T is None:
+        # Piglet records its whole value history, keep the convergence plot small
+        args.T = 2 if args.kind == "convergence" else 100
+    if args.kind == "convergence":
+        fig = vis.plot_piglet_convergence(_solved(args, "piglet", trace=True), mode=args.mode)
+    else:
+        res = _solved(args)
+        if args.kind == "policy":
+            fig = vis.plot_pig_policy(res)
+        elif args.kind == "reachable":
+            fig = vis.plot_reachable_states(res, optimal=args.optimal)
+        elif args.kind == "contours":
+            fig = vis.plot_win_prob_contours(res)
+        elif args.kind == "cross-sections":
+            fig = vis.plot_cross_sections(res)
+        else:
+            fig = vis.plot_cross_section(res, section=args.section)
+
+    if args.output.endswith(".html"):
+        fig.write_html(args.output)
+    else:
+        fig.write_image(args.output)
+    print(args.output)
+
+
+def _targets(value: str) -> list[int]:
+    # "50" or an inclusive range "2-200"
+    first, _, last = value.partition("-")
+    try:
+        return list(range(int(first), int(last or first) + 1))
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"invalid target {value!r}, expected T or FIRST-LAST") from None
+
+
+def sweep(args):
+    """Solve a grid of targets and variants in parallel and summarise them"""
+    from sweep import make_jobs, run_sweep
+    targets = [T for group in args.targets for T in group]
+    jobs = make_jobs(args.variants, targets, args.tols)
+    print(run_sweep(jobs, args.results, workers=args.workers, iter_max=args.iter_max,
+                    sections=args.sections))
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(prog="pig", description="Optimal play of the dice game Pig")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    p = commands.add_parser("solve", help=solve.__doc__, description=solve.__doc__)
+    p.add_argument("--variant", choices=("pig", "piglet"), default="pig", help="game variant (default: pig)")
+    _add_game_arguments(p)
+    p.add_argument("--force", action="store_true", help="solve again even if a stored result exists")
+    p.set_defaults(func=solve)
+
+    p = commands.add_parser("simulate", help=simulate.__doc__, description=simulate.__doc__)
+    _add_game_arguments(p)
+    p.add_argument("-n", type=int, default=5000, help="games per starting score (default: 5000)")
+    p.add_argument("-o", "--output", default="simulation.csv", help="output CSV file (default: simulation.csv)")
+    p.set_defaults(func=simulate)
+
+    p = commands.add_parser("tournament", help=tournament.__doc__, description=tournament.__doc__)
+    _add_game_arguments(p)
+    p.add_argument("-n", type=int, default=10000, help="games per match (default: 10000)")
+    p.add_argument("-o", "--output", default="tournament.json", help="output JSON file (default: tournament.json)")
+    p.set_defaults(func=tournament)
+
+    p = commands.add_parser("plot", help=plot.__doc__, description=plot.__doc__)
+    p.add_argument("kind", choices=PLOTS, help="figure to produce (convergence uses Piglet)")
+    _add_game_arguments(p, T=None, T_help="target score (default: 2 for convergence, 100 otherwise)")
+    p.add_argument("--section", type=int, default=30, help="opponent score of the cross section (default: 30)")
+    p.add_argument("--optimal", action="store_true", help="reachable frontier cut by the optimal policy")
+    p.add_argument("--mode", choices=("auto", "lines", "webgl", "bands"), default="auto",
+                   help="convergence plot mode (default: auto)")
+    p.add_argument("-o", "--output", default=None, help="output file, .html or an image format (default: <kind>.html)")
+    p.set_defaults(func=plot)
+
+    p = commands.add_parser("sweep", help=sweep.__doc__, description=sweep.__doc__)
+    p.add_argument("--variants", nargs="+", choices=("pig", "piglet"), default=["pig"],
+                   help="game variants (default: pig)")
+    p.add_argument("--targets", nargs="+", type=_targets, default=[_targets("2-100")],
+                   help="targets T or inclusive ranges FIRST-LAST (default: 2-100)")
+    p.add_argument("--tols", nargs="+", type=float, default=[1e-6], help="tolerances (default: 1e-6)")
+    p.add_argument("--sections", nargs="+", type=int, default=[0],
+                   help="opponent scores of the threshold curves (default: 0)")
+    p.add_argument("--workers", type=int, default=None, help="number of processes (default: one per CPU)")
+    p.add_argument("--iter-max", type=int, default=1000, help="maximum number of iterations (default: 1000)")
+    p.add_argument("--results", default="results", help="directory of solved games and tables (default: results)")
+    p.set_defaults(func=sweep)
+
+    return parser
+
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+    if getattr(args, "output", "") is None:
+        args.output = f"{args.kind}.html"
+    args.func(args)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
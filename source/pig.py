@@ -1,16 +1,50 @@
+from acceleration import Accelerator
+from tables import MIN_TOLERANCE, StateSpace, ValueView, PolicyView, table_precision, TraceView, value_table
+
 
 class Pig():
-    # Constructor
-    def __init__(self, T: int = 2):
+    __slots__ = ("T", "A", "iter", "converge", "_space", "_values", "_policy", "_policy_view", "_trace")
+
+    # Policy codes stored in the uint8 policy array
+    ACTIONS = (None, "roll", "hold")
+
+    # Constructor, precision "float32" halves the memory of the value table
+    def __init__(self, T: int = 2, precision: str = "float64"):
         self.T = T
-        self.S = [(i,j,k) for i in range(T) for j in range(T) for k in range(T-i)]
-        self.S.reverse()
+        self._space = StateSpace(T)
         self.A = {"roll","hold"}
-        self.V = {s:0 for s in self.S}
-        self.policy = {s: None for s in self.S}
+        self._values = value_table(len(self._space), precision)
+        self._policy = bytearray(len(self._space))
+        self._policy_view = PolicyView(self._space, self._policy, self.ACTIONS)
+        self._trace = None
         self.iter = 0
         self.converge = None
 
+    # States, computed from their index on demand
+    @property
+    def S(self) -> StateSpace:
+        return self._space
+
+    # Storage precision of the value function
+    @property
+    def precision(self) -> str:
+        return table_precision(self._values)
+
+    # Read-only view of the value function
+    @property
+    def V(self) -> ValueView:
+        return ValueView(self._space, self._values)
+
+    # Read-only view of the policy, built once since the policy array is updated in place
+    @property
+    def policy(self) -> PolicyView:
+        return self._policy_view
+
+    # Read-only view of the value of every state along the iterations, None if not recorded
+    @property
+    def trace(self) -> TraceView | None:
+        return None if self._trace is None else TraceView(self._space, self._trace)
+
     # Define a winning state
     def isWin(self, s: tuple[int, int, int]) -> bool:
         return s[0] + s[2] >= self.T
@@ -26,7 +60,7 @@ class Pig():
         elif self.isLoss(s):
             return 0
         else:
-            return self.V[s]
+            return self._values[self._space.index(s)]
 
     # Value state-action
     def value_action(self, s: tuple[int,int,int], a: str):
@@ -36,26 +70,63 @@ class Pig():
         elif a == "hold":
             return 1.0 - self.value((s[1],s[0]+s[2],0))
 
-    # Value iteration algorithm
-    def value_iteration(self, gamma: float = 1.0, tol: float = 1e-3, iter_max: int = 1000):
+    # One in-place (Gauss-Seidel) sweep over the states, every backup relaxed by omega,
+    # returns the largest Bellman change
+    def _sweep(self, omega: float = 1.0) -> float:
+        T = self.T
+        V = self._values
+        policy = self._policy
+        offset = self._space._offset
+        last = len(self._space) - 1
+        delta = 0.0
+        p = 0
+        for i in reversed(range(T)):
+            for j in reversed(range(T)):
+                # Value after rolling a 1, (j, i, 0) is only updated at the end of this block
+                pig_out = 1.0 - V[last - offset[j] - i * (T - j)]
+                n = T - i
+                for k in reversed(range(n)):
+                    aux = pig_out
+                    for r in range(2, 7):
+                        aux += V[p - r] if k + r < n else 1.0
+                    roll = aux / 6
+                    hold = 1.0 - V[last - offset[j] - (i + k) * (T - j)]
+                    if roll > hold:
+                        policy[p], aux_value = 1, roll
+                    else:
+                        policy[p], aux_value = 2, hold
+                    delta = max(delta, abs(aux_value - V[p]))
+                    if omega != 1.0:
+                        aux_value = min(1.0, max(0.0, V[p] + omega * (aux_value - V[p])))
+                    V[p] = aux_value
+                    p += 1
+        return delta
+
+    # Value iteration algorithm, accel="sor" or "aitken" for safeguarded acceleration,
+    # trace=True records the values after every sweep (one full value table per sweep)
+    def value_iteration(self, gamma: float = 1.0, tol: float = 1e-3, iter_max: int = 1000,
+                        accel: str | None = None, omega: float | None = None, trace: bool = False):
         if not (0 < gamma <= 1):  # Validate gamma
             raise ValueError(f"Value {gamma} is out of range (0, 1]")
+        if tol < MIN_TOLERANCE[self.precision]:  # Validate tol against the storage precision
+            raise ValueError(f"Tolerance {tol:g} is below the resolution of {self.precision} values, "
+                             f"use at least {MIN_TOLERANCE[self.precision]:g}")
 
-        iteration_count = 1
+        accelerator = Accelerator(accel, omega)
+        if trace and self._trace is None:
+            self._trace = self._values[:]
 
         for iter in range(1,iter_max+1):
-            delta = 0 
-            for s in self.S:
-                self.policy[s], aux_value = max(((a, self.value_action(s, a)) for a in self.A), key=lambda x: x[1])
-                delta = max(delta, abs(aux_value - self.V[s]))   
-                self.V[s] = aux_value  
-
-            iteration_count += 1
+            delta = self._sweep(accelerator.omega)
+            if trace:
+                self._trace.extend(self._values)
 
             if delta < tol:
                 self.iter = iter
                 self.converge = True
                 return
+
+            self._values = accelerator.update(self._values, delta)
         
         self.iter = iter_max
         self.converge = False
@@ -72,5 +143,3 @@ class Pig():
         print("Optimal Values:")
         for state, value in self.V.items():
             print(f"{state}: {value}")
-
-
@@ -1,9 +1,7 @@
 # source/simulation.py
 
 import random
-import numpy as np
 from pig import Pig
-import random
 from statistics import mean
 
 def simulate_one(pig: Pig, start_i=0, start_j=0):
@@ -13,6 +11,8 @@ def simulate_one(pig: Pig, start_i=0, start_j=0):
     or (None, None) if the opponent wins.
     """
     T = pig.T
+    policy = pig.policy
+    hold = pig.ACTIONS.index("hold")
     scores = [start_i, start_j]
     turn = 0
     turns_taken = 0
@@ -25,7 +25,8 @@ def simulate_one(pig: Pig, start_i=0, start_j=0):
         if i >= T or j >= T:
             break
 
-        # Play one turn
+        # Play one turn, with the actions of every turn total at scores (i, j)
+        codes = policy.turn_codes(i, j)
         while True:
             # Terminal check: if our next hold would win, do it
             if i + k >= T:
@@ -35,8 +36,7 @@ def simulate_one(pig: Pig, start_i=0, start_j=0):
                 break
 
             # Look up policy now safe: k < T−i
-            action = pig.policy.get((i, j, k), "hold")
-            if action == "hold":
+            if codes[k] == hold:
                 scores[turn] += k
                 if turn == 0:
                     turns_taken += 1
@@ -69,6 +69,8 @@ def simulate_many(pig: Pig, n=5000):
       avg_turns[i]  = average turns to win starting at i,
       avg_margin[i] = average margin of victory starting at i.
     """
+    import numpy as np
+
     T = pig.T
     avg_turns = np.zeros(T)
     avg_margin = np.zeros(T)
@@ -122,18 +124,19 @@ def optimal_policy(i, j, k, result_pig):
     return result_pig.policy[i, j, k]
 
 
-def game(strats):
+def game(strats, T=100):
     """
     Simulates a single game of Pig with two strategies.
 
     Parameters:
     - strats: a list of two policy functions. Each function takes (i, j, k) as input.
+    - T: target score (default: 100)
 
     Returns:
     - The index (0 or 1) of the winning player
     """
     scores = [0, 0]
-    while max(scores) < 100:
+    while max(scores) < T:
         for i in range(2):
             round_score = 0
             roll = 0
@@ -142,7 +145,7 @@ def game(strats):
             while policy(scores[i], scores[1 - i], round_score) == 'roll' and roll != 1:
                 roll = random.choice([1, 2, 3, 4, 5, 6])
                 round_score = (roll != 1) * (round_score + roll)
-                if scores[i] + round_score >= 100 and roll != 1:
+                if scores[i] + round_score >= T and roll != 1:
                     return i
             scores[i] += round_score
     return scores.index(max(scores))
@@ -163,12 +166,15 @@ def tournament(n, result_pig):
          optimal vs hold-at-20 (goes second),
          hold-at-20 vs optimal (goes second)]
     """
+    policy = result_pig.policy
+
     def op(i, j, k):
-        return optimal_policy(i, j, k, result_pig)
+        return policy[i, j, k]
 
-    opt_v_opt = [1 - game([op, op]) for _ in range(n)]
-    opt_v_hold = [1 - game([op, hold_at_twenty]) for _ in range(n)]
-    hold_v_opt = [1 - game([hold_at_twenty, op]) for _ in range(n)]
+    T = result_pig.T
+    opt_v_opt = [1 - game([op, op], T) for _ in range(n)]
+    opt_v_hold = [1 - game([op, hold_at_twenty], T) for _ in range(n)]
+    hold_v_opt = [1 - game([hold_at_twenty, op], T) for _ in range(n)]
 
     return [mean(opt_v_opt), mean(opt_v_hold), mean(hold_v_opt)]
 
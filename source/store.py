@@ -0,0 +1,105 @@
+import os
+import pickle
+import time
+
+from pig import Pig
+from piglet import Piglet
+
+VARIANTS = {"pig": Pig, "piglet": Piglet}
+
+
+def result_path(directory: str, variant: str, T: int, tol: float) -> str:
+    """Path of a solved game inside a result directory
+
+    Args:
+        directory (str): Result directory
+        variant (str): Game variant, "pig" or "piglet"
+        T (int): Target score
+        tol (float): Tolerance used in value iteration
+
+    Returns:
+        str: Path of the pickled result
+    """
+    return os.path.join(directory, f"{variant}_T{T}_tol{tol:g}.pkl")
+
+
+def save_result(path: str, res, tol: float, elapsed: float | None = None, iter_max: int | None = None):
+    """Pickle a solved game together with the parameters used to solve it
+
+    The file is written to a temporary name first and then renamed, so an
+    interrupted write never leaves a truncated result behind.
+    """
+    directory = os.path.dirname(path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    record = {"variant": type(res).__name__.lower(), "T": res.T, "tol": tol,
+              "iter_max": iter_max, "elapsed": elapsed, "result": res}
+    tmp = f"{path}.tmp{os.getpid()}"
+    with open(tmp, "wb") as f:
+        pickle.dump(record, f, protocol=pickle.HIGHEST_PROTOCOL)
+    os.replace(tmp, path)
+
+
+def load_result(path: str) -> dict:
+    """Load a record written by `save_result`"""
+    with open(path, "rb") as f:
+        return pickle.load(f)
+
+
+def _reusable(record: dict, iter_max: int, trace: bool = False) -> bool:
+    # A run stopped by iter_max only stands for runs with no more iterations,
+    # and a run without value history for runs that do not need it
+    res = record["result"]
+    if trace and res.trace is None:
+        return False
+    return bool(res.converge) or (record.get("iter_max") or 0) >= iter_max
+
+
+def solve_record(variant: str, T: int, tol: float, directory: str | None = None,
+                 iter_max: int = 1000, force: bool = False, trace: bool = False) -> dict:
+    """Solve a game by value iteration, reusing a stored result if present
+
+    A stored result that did not converge is only reused if it was solved
+    with at least iter_max iterations, otherwise the game is solved again.
+    The value history (one value table per sweep, gigabytes for large targets)
+    is only recorded and stored with `trace=True`.
+
+    Args:
+        variant (str): Game variant, "pig" or "piglet"
+        T (int): Target score
+        tol (float): Tolerance used in value iteration
+        directory (str | None, optional): Result directory. Defaults to None (no storage).
+        iter_max (int, optional): Maximum number of iterations. Defaults to 1000.
+        force (bool, optional): Solve again even if a stored result exists. Defaults to False.
+        trace (bool, optional): Record the value history of every sweep. Defaults to False.
+
+    Returns:
+        dict: Record with the parameters, the solve time in seconds ("elapsed")
+        and the solved game ("result")
+    """
+    if variant not in VARIANTS:
+        raise ValueError(f"Unknown variant {variant!r}, expected one of {sorted(VARIANTS)}")
+
+    path = None if directory is None else result_path(directory, variant, T, tol)
+    if path is not None and not force and os.path.exists(path):
+        record = load_result(path)
+        if _reusable(record, iter_max, trace):
+            return record
+
+    start = time.perf_counter()
+    res = VARIANTS[variant](T=T)
+    res.value_iteration(tol=tol, iter_max=iter_max, trace=trace)
+    elapsed = time.perf_counter() - start
+    if path is not None:
+        save_result(path, res, tol, elapsed, iter_max)
+    return {"variant": variant, "T": T, "tol": tol, "iter_max": iter_max, "elapsed": elapsed, "result": res}
+
+
+def load_or_solve(variant: str, T: int, tol: float, directory: str | None = None,
+                  iter_max: int = 1000, force: bool = False, trace: bool = False):
+    """Solved game of `solve_record`
+
+    Returns:
+        Pig | Piglet: The solved game
+    """
+    return solve_record(variant, T, tol, directory, iter_max, force, trace)["result"]
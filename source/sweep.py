@@ -0,0 +1,121 @@
+import csv
+import os
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+from store import solve_record
+
+SUMMARY_FIELDS = ("variant", "T", "tol", "iter", "converge", "seconds", "win_prob")
+THRESHOLD_FIELDS = ("variant", "T", "tol", "j", "i", "k")
+
+
+def make_jobs(variants, targets, tols) -> list[tuple[str, int, float]]:
+    """Grid of (variant, T, tol) jobs, largest first
+
+    The number of states grows as T^3, so scheduling the largest targets first
+    keeps the process pool busy until the end of the sweep.
+
+    Args:
+        variants (iterable): Game variants, "pig" and/or "piglet"
+        targets (iterable): Target scores
+        tols (iterable): Tolerances used in value iteration
+
+    Returns:
+        list[tuple[str, int, float]]: Jobs sorted from the most to the least expensive
+    """
+    jobs = {(v, int(T), float(tol)) for v in variants for T in targets for tol in tols}
+    return sorted(jobs, key=lambda job: (job[1], job[0] == "pig", -job[2]), reverse=True)
+
+
+def run_job(job: tuple[str, int, float], directory: str, iter_max: int = 1000, sections=(0,)):
+    """Solve one job, or load it from the result directory, and summarise it
+
+    Returns:
+        tuple[dict, list[dict]]: Summary row and threshold curve rows
+    """
+    variant, T, tol = job
+    record = solve_record(variant, T, tol, directory, iter_max=iter_max)
+    res = record["result"]
+    row = {"variant": variant, "T": T, "tol": tol, "iter": res.iter, "converge": res.converge,
+           "seconds": record.get("elapsed"), "win_prob": res.V[0, 0, 0]}
+    curves = [{"variant": variant, "T": T, "tol": tol, "j": j, "i": i, "k": k}
+              for j in sections if j < T
+              for i, k in enumerate(res.policy.hold_thresholds(j))]
+    return row, curves
+
+
+def _job_key(row: dict) -> tuple[str, int, float]:
+    return row["variant"], int(row["T"]), float(row["tol"])
+
+
+def _read_rows(path: str) -> list[dict]:
+    if not os.path.exists(path):
+        return []
+    with open(path, newline="") as f:
+        return list(csv.DictReader(f))
+
+
+def _open_table(path: str, fields, rows) -> tuple:
+    # Rewrite the table with the rows to keep, then leave it open for appending
+    f = open(path, "w", newline="")
+    writer = csv.DictWriter(f, fieldnames=fields)
+    writer.writeheader()
+    writer.writerows(rows)
+    f.flush()
+    return f, writer
+
+
+def run_sweep(jobs, directory: str = "results", workers: int | None = None,
+              iter_max: int = 1000, sections=(0,)) -> str:
+    """Solve a grid of jobs on a process pool and write the summary tables
+
+    Every solved game is stored in `directory`, and one row per finished job is
+    appended to `sweep.csv` (iterations, solve time, win probability at
+    (0, 0, 0)) and its threshold curves to `thresholds.csv`. Jobs that converged
+    in `sweep.csv` are skipped, so an interrupted sweep resumes where it
+    stopped, while jobs stopped by iter_max are run again. Rows of jobs outside
+    the grid are left untouched.
+
+    Args:
+        jobs (list): (variant, T, tol) jobs, see `make_jobs`
+        directory (str, optional): Result directory. Defaults to "results".
+        workers (int | None, optional): Number of processes. Defaults to None (one per CPU).
+        iter_max (int, optional): Maximum number of iterations. Defaults to 1000.
+        sections (tuple, optional): Opponent scores of the threshold curves. Defaults to (0,).
+
+    Returns:
+        str: Path of the summary table
+    """
+    os.makedirs(directory, exist_ok=True)
+    summary_path = os.path.join(directory, "sweep.csv")
+    thresholds_path = os.path.join(directory, "thresholds.csv")
+
+    # A job of the grid is finished once a converged summary row is written. The rows
+    # and partial curves of the others are dropped, as they are solved again (with a
+    # larger iter_max), and the rows of jobs outside the grid are kept as they are
+    rows = _read_rows(summary_path)
+    done = {_job_key(row) for row in rows if row["converge"] == "True"}
+    pending = [job for job in jobs if job not in done]
+    rerun = set(pending)
+    summary_rows = [row for row in rows if _job_key(row) not in rerun]
+    curve_rows = [row for row in _read_rows(thresholds_path) if _job_key(row) not in rerun]
+
+    summary, summary_writer = _open_table(summary_path, SUMMARY_FIELDS, summary_rows)
+    thresholds, thresholds_writer = _open_table(thresholds_path, THRESHOLD_FIELDS, curve_rows)
+
+    def write(row, curves):
+        thresholds_writer.writerows(curves)
+        thresholds.flush()
+        summary_writer.writerow(row)
+        summary.flush()
+
+    with summary, thresholds:
+        if workers == 1:
+            for job in pending:
+                write(*run_job(job, directory, iter_max, sections))
+        else:
+            with ProcessPoolExecutor(max_workers=workers) as pool:
+                futures = [pool.submit(run_job, job, directory, iter_max, sections) for job in pending]
+                for future in as_completed(futures):
+                    write(*future.result())
+
+    return summary_path
@@ -0,0 +1,224 @@
+from array import array
+from bisect import bisect_right
+from collections.abc import ItemsView, Mapping, Sequence
+
+
+class StateSpace(Sequence):
+    """Read-only sequence of the non-terminal states (i, j, k) of a target T
+
+    States are never stored: they are computed from their position on demand.
+    The order matches the original `S` list, i.e. the reversed lexicographic
+    enumeration of (i, j, k) with 0 <= i, j < T and 0 <= k < T - i.
+
+    Args:
+        T (int): Target score of the game
+    """
+    __slots__ = ("T", "_offset", "_size")
+
+    def __init__(self, T: int):
+        self.T = T
+        # _offset[i] = number of states with a player 1 score lower than i
+        self._offset = [0]
+        for i in range(T):
+            self._offset.append(self._offset[-1] + T * (T - i))
+        self._size = self._offset[-1]
+
+    def __reduce__(self):
+        return (StateSpace, (self.T,))
+
+    def __len__(self) -> int:
+        return self._size
+
+    def __getitem__(self, p):
+        if isinstance(p, slice):
+            return [self[q] for q in range(*p.indices(self._size))]
+        if p < 0:
+            p += self._size
+        if not 0 <= p < self._size:
+            raise IndexError("state index out of range")
+        f = self._size - 1 - p
+        i = bisect_right(self._offset, f) - 1
+        j, k = divmod(f - self._offset[i], self.T - i)
+        return (i, j, k)
+
+    def __iter__(self):
+        T = self.T
+        for i in reversed(range(T)):
+            for j in reversed(range(T)):
+                for k in reversed(range(T - i)):
+                    yield (i, j, k)
+
+    def __contains__(self, s) -> bool:
+        try:
+            self.index(s)
+        except (KeyError, TypeError, ValueError):
+            return False
+        return True
+
+    def index(self, s: tuple[int, int, int]) -> int:
+        """Position of the state s in the sequence
+
+        Args:
+            s (tuple[int, int, int]): State (i, j, k)
+
+        Raises:
+            KeyError: If s is not a non-terminal state
+
+        Returns:
+            int: Position of s
+        """
+        i, j, k = s
+        T = self.T
+        if not (0 <= i < T and 0 <= j < T and 0 <= k < T - i):
+            raise KeyError(s)
+        return self._size - 1 - (self._offset[i] + j * (T - i) + k)
+
+    def __repr__(self) -> str:
+        return f"StateSpace(T={self.T})"
+
+
+class _TableItems(ItemsView):
+    # Pair states and entries in one pass instead of one lookup per state
+    def __iter__(self):
+        table = self._mapping
+        for s, p in zip(table._space, range(len(table._space))):
+            yield s, table._entry(p)
+
+
+class _TableView(Mapping):
+    __slots__ = ("_space", "_data")
+
+    def __init__(self, space: StateSpace, data):
+        self._space = space
+        self._data = data
+
+    def _entry(self, p: int):
+        raise NotImplementedError
+
+    def _position(self, s) -> int:
+        # Position of s in the tables, -1 if s is not a state
+        try:
+            return self._space.index(s)
+        except (KeyError, TypeError, ValueError):
+            return -1
+
+    def __getitem__(self, s):
+        p = self._position(s)
+        if p < 0:
+            raise KeyError(s)
+        return self._entry(p)
+
+    def get(self, s, default=None):
+        p = self._position(s)
+        return default if p < 0 else self._entry(p)
+
+    def __iter__(self):
+        return iter(self._space)
+
+    def __len__(self) -> int:
+        return len(self._space)
+
+    def __contains__(self, s) -> bool:
+        return s in self._space
+
+    def items(self):
+        return _TableItems(self)
+
+    def values(self):
+        return [self._entry(p) for p in range(len(self._space))]
+
+    def __repr__(self) -> str:
+        return f"{type(self).__name__}(T={self._space.T})"
+
+
+class ValueView(_TableView):
+    """Read-only mapping state -> value backed by a flat array"""
+    __slots__ = ()
+
+    def _entry(self, p: int) -> float:
+        return self._data[p]
+
+
+class PolicyView(_TableView):
+    """Read-only mapping state -> action backed by a uint8 code array"""
+    __slots__ = ("_names",)
+
+    def __init__(self, space: StateSpace, data: bytearray, names: tuple):
+        super().__init__(space, data)
+        self._names = names
+
+    def _entry(self, p: int):
+        return self._names[self._data[p]]
+
+    def turn_codes(self, i: int, j: int) -> bytes:
+        """Action codes of the states (i, j, k) for k = 0, ..., T - i - 1
+
+        Codes index the action names of the game (e.g. `Pig.ACTIONS`), so a
+        simulated turn reads its actions from one small slice.
+        """
+        # The states of a turn are stored contiguously, k = 0 last
+        first = self._position((i, j, 0))
+        if first < 0:
+            raise KeyError((i, j))
+        n = self._space.T - i
+        return bytes(self._data[first - n + 1:first + 1][::-1])
+
+    def hold_thresholds(self, j: int) -> list[int]:
+        """Threshold curve of the policy for an opponent score
+
+        Args:
+            j (int): Opponent score
+
+        Returns:
+            list[int]: For every player score i, the smallest turn total at which
+            the policy holds, T - i if it keeps rolling (flipping) until the win
+        """
+        hold = self._names.index("hold")
+        T = self._space.T
+        curve = []
+        for i in range(T):
+            k = self.turn_codes(i, j).find(hold)
+            curve.append(T - i if k < 0 else k)
+        return curve
+
+
+class TraceView(_TableView):
+    """Read-only mapping state -> list of values, one per sweep
+
+    The history is stored as one flat array holding a full value vector per
+    sweep, so the series of a state is a strided slice of it.
+    """
+    __slots__ = ()
+
+    def _entry(self, p: int) -> list:
+        return self._data[p::len(self._space)].tolist()
+
+
+# Storage precision of the value arrays and their array typecodes
+PRECISIONS = {"float64": "d", "float32": "f"}
+
+# Smallest tolerance value iteration can meet at each precision: float32 rounds
+# values close to 1 by about 6e-8, and the rounding of the backups keeps the
+# largest change of a Pig sweep around 5e-7 however long it runs
+MIN_TOLERANCE = {"float64": 0.0, "float32": 1e-6}
+
+
+def value_table(n: int, precision: str = "float64") -> array:
+    """Zero initialised value array of n entries
+
+    Args:
+        n (int): Number of entries
+        precision (str, optional): "float64" or "float32". Defaults to "float64".
+
+    Returns:
+        array: Value array
+    """
+    if precision not in PRECISIONS:
+        raise ValueError(f"Unknown precision {precision!r}, expected one of {tuple(PRECISIONS)}")
+    typecode = PRECISIONS[precision]
+    return array(typecode, bytes(n * array(typecode).itemsize))
+
+
+def table_precision(values: array) -> str:
+    """Precision name of a value array"""
+    return {code: name for name, code in PRECISIONS.items()}[values.typecode]
@@ -0,0 +1,104 @@
+from fractions import Fraction
+
+
+def _backups(res, value):
+    # Yield every state of res with the values of rolling (flipping) and holding,
+    # computed from value(s) in the arithmetic of its numbers
+    die = res.ACTIONS[1] == "roll"
+    for i, j, k in res.S:
+        if die:
+            go = (1 - value((j, i, 0)) + sum(value((i, j, k + r)) for r in range(2, 7))) / 6
+        else:
+            go = (1 - value((j, i, 0)) + value((i, j, k + 1))) / 2
+        hold = 1 - value((j, i + k, 0))
+        yield (i, j, k), go, hold
+
+
+def _value_function(res, number):
+    values = res._values
+    index = res.S.index
+
+    def value(s):
+        if res.isWin(s):
+            return 1
+        elif res.isLoss(s):
+            return 0
+        else:
+            return number(values[index(s)])
+    return value
+
+
+def verify_policy(res, reference=None, exact: bool = False, tol: float = 1e-9) -> dict:
+    """Check a solved table, typically a float32 one, against a reference
+
+    The Bellman residuals of the stored values are recomputed in float64, or
+    in exact rational arithmetic with `exact=True` (every float is converted
+    exactly, which is only practical for small T), both for the best action,
+    |max_a Q(s, a) - V(s)|, and for the action of the stored policy,
+    |Q(s, policy(s)) - V(s)|. The stored policy is compared with the policy
+    of a converged float64 reference solve, and for every differing state the
+    gap between the action values of both actions under the reference values
+    is reported: a tiny gap means the two actions are practically equivalent.
+
+    Args:
+        res (Pig | Piglet): Solved game to verify
+        reference (Pig | Piglet, optional): Solved float64 game with the same target.
+            Defaults to None (solved here with tolerance tol).
+        exact (bool, optional): Use exact rational arithmetic. Defaults to False.
+        tol (float, optional): Tolerance of the reference solve. Defaults to 1e-9.
+
+    Raises:
+        ValueError: If the reference has another target or did not converge
+
+    Returns:
+        dict: Report with the keys
+            "precision": storage precision of res,
+            "arithmetic": "exact" or "float64",
+            "max_residual", "mean_residual": Bellman residuals of res for the best action,
+            "worst_state": state with the largest residual,
+            "policy_max_residual", "policy_mean_residual": Bellman residuals of res
+                for the action of its policy,
+            "reference_iter": sweeps of the reference solve,
+            "policy_diffs": list of (state, action, reference action, gap)
+    """
+    if reference is None:
+        reference = type(res)(T=res.T)
+        reference.value_iteration(tol=tol, trace=False)
+    elif reference.T != res.T:
+        raise ValueError(f"Reference target {reference.T} differs from {res.T}")
+    if not reference.converge:
+        raise ValueError(f"Reference solve did not converge after {reference.iter} iterations")
+
+    number = Fraction if exact else float
+    value = _value_function(res, number)
+    ref_value = _value_function(reference, number)
+
+    policy, ref_policy = res.policy, reference.policy
+    max_residual, total, worst_state = 0, 0, None
+    policy_max_residual, policy_total = 0, 0
+    for s, go, hold in _backups(res, value):
+        v = value(s)
+        residual = abs(max(go, hold) - v)
+        total += residual
+        if worst_state is None or residual > max_residual:
+            max_residual, worst_state = residual, s
+        policy_residual = abs((hold if policy[s] == "hold" else go) - v)
+        policy_total += policy_residual
+        policy_max_residual = max(policy_max_residual, policy_residual)
+
+    policy_diffs = []
+    for s, go, hold in _backups(reference, ref_value):
+        if policy[s] != ref_policy[s]:
+            policy_diffs.append((s, policy[s], ref_policy[s], float(abs(go - hold))))
+
+    return {
+        "precision": res.precision,
+        "arithmetic": "exact" if exact else "float64",
+        "max_residual": float(max_residual),
+        "mean_residual": float(total / len(res.S)),
+        "worst_state": worst_state,
+        "policy_max_residual": float(policy_max_residual),
+        "policy_mean_residual": float(policy_total / len(res.S)),
+        "reference_iter": reference.iter,
+        "policy_diffs": policy_diffs,
+    }
@@ -5,34 +5,152 @@ from piglet import Piglet
 from pig import Pig
 
 
-def plot_piglet_convergence(res: Piglet):
-    """Convergence plot for Piglet
+def downsample_minmax(y, max_points: int = 1000):
+    """Reduce a series to at most max_points points, preserving its extremes
+
+    The series is split into max_points // 4 buckets, and for every bucket the
+    first, smallest, largest and last points are kept, so the plotted line
+    covers the same range at every pixel column as the full series. Points
+    shared by these roles leave room in the budget, which is filled with
+    evenly spaced points, so min(len(y), max_points) points are kept.
 
     Args:
-        res (Piglet): Piglet class for getting trace of the value function
+        y (array-like): Series, one value per iteration
+        max_points (int, optional): Budget of points, at least 4. Defaults to 1000.
+
+    Raises:
+        ValueError: If max_points is lower than 4
 
     Returns:
-        fig: A plotly figure
+        tuple[np.ndarray, np.ndarray]: Kept iterations and values
+    """
+    if max_points < 4:
+        raise ValueError(f"Budget of {max_points} points is too small, at least 4 are needed")
+    y = np.asarray(y)
+    n = len(y)
+    if n <= max_points:
+        return np.arange(n), y
+    edges = np.linspace(0, n, max_points // 4 + 1).astype(np.int64)
+    keep = set()
+    for start, end in zip(edges[:-1], edges[1:]):
+        bucket = y[start:end]
+        keep.update((start, start + int(bucket.argmin()), start + int(bucket.argmax()), end - 1))
+    missing = max_points - len(keep)
+    if missing:
+        # n > max_points, so the evenly spaced candidates are distinct and enough to fill the budget
+        spare = [p for p in np.linspace(0, n - 1, max_points).round().astype(np.int64) if p not in keep]
+        keep.update(spare[q] for q in np.linspace(0, len(spare) - 1, missing).round().astype(np.int64))
+    x = np.array(sorted(keep))
+    return x, y[x]
+
+def trace_matrix(res):
+    """Recorded value history of a solver as a read-only matrix
+
+    The history is copied, so the solver can keep extending its trace while
+    the matrix is in use.
+
+    Args:
+        res (Pig | Piglet): Solved game, Pig solved with trace=True
+
+    Returns:
+        np.ndarray: Array of shape (recorded sweeps, states), columns in the order of res.S
     """
-    curves_dict = res.trace
+    if res.trace is None:
+        raise ValueError("No value history recorded, solve with value_iteration(trace=True)")
+    history = np.frombuffer(res._trace.tobytes(), dtype=np.float32 if res.precision == "float32" else np.float64)
+    return history.reshape(-1, len(res.S))
+
+def plot_convergence(res, mode: str = "auto", max_points: int = 1000,
+                     quantiles: tuple[float, ...] = (0.0, 0.05, 0.25, 0.5, 0.75, 0.95, 1.0)):
+    """Convergence plot of the value of every state along the iterations
 
-    x = list(range(len(next(iter(curves_dict.values())))))
+    Args:
+        res (Pig | Piglet): Solved game with a recorded trace
+        mode (str, optional): "lines" one SVG line per state, "webgl" one WebGL line
+            per state downsampled to max_points, "bands" quantiles over the states
+            as WebGL bands, or "auto" for the lightest one that shows every state
+            individually when it fits the budget. Defaults to "auto".
+        max_points (int, optional): Budget of points per line. Defaults to 1000.
+        quantiles (tuple[float, ...], optional): Quantiles of the bands, the median
+            is drawn as a line. Defaults to (0.0, 0.05, 0.25, 0.5, 0.75, 0.95, 1.0).
+
+    Returns:
+        fig: A plotly figure
+    """
+    history = trace_matrix(res)
+    n_iter, n_states = history.shape
+    if mode == "auto":
+        if n_states * n_iter <= 20 * max_points:
+            mode = "lines"
+        elif n_states <= 100:
+            mode = "webgl"
+        else:
+            mode = "bands"
 
     fig = go.Figure()
 
-    # Add each curve to the figure
-    for name, y_values in curves_dict.items():
-        fig.add_trace(go.Scatter(x=x, y=y_values, mode="lines", name=str(name)))
+    if mode == "lines":
+        # Add each curve to the figure
+        x = list(range(n_iter))
+        for name, y_values in res.trace.items():
+            fig.add_trace(go.Scatter(x=x, y=y_values, mode="lines", name=str(name)))
+    elif mode == "webgl":
+        for p, name in enumerate(res.S):
+            x, y = downsample_minmax(history[:, p], max_points)
+            fig.add_trace(go.Scattergl(x=x, y=y, mode="lines", name=str(name)))
+    elif mode == "bands":
+        levels = np.quantile(history, quantiles, axis=1)
+        x = np.arange(n_iter)
+        if n_iter > max_points:
+            # Keep the envelope of every band: minimum of the lower and maximum of the upper
+            # quantiles, and the median at the centre of every bucket
+            bounds = np.linspace(0, n_iter, max_points + 1).astype(np.int64)
+            edges = bounds[:-1]
+            centres = (bounds[:-1] + bounds[1:] - 1) // 2
+            q = np.asarray(quantiles)[:, None]
+            lower = np.minimum.reduceat(levels, edges, axis=1)
+            upper = np.maximum.reduceat(levels, edges, axis=1)
+            levels = np.where(q < 0.5, lower, np.where(q > 0.5, upper, levels[:, centres]))
+            x = centres
+        half = len(quantiles) // 2
+        for b in range(half):
+            lo, hi = quantiles[b], quantiles[-1 - b]
+            name = f"{lo:.0%}-{hi:.0%} of states"
+            opacity = 0.15 + 0.6 * (b + 1) / (half + 1)
+            color = f"rgba(31, 119, 180, {opacity:.2f})"
+            fig.add_trace(go.Scattergl(x=x, y=levels[b], mode="lines", line=dict(width=0),
+                                       legendgroup=name, showlegend=False, hoverinfo="skip"))
+            fig.add_trace(go.Scattergl(x=x, y=levels[-1 - b], mode="lines", line=dict(width=0),
+                                       fill="tonexty", fillcolor=color, legendgroup=name, name=name))
+        if len(quantiles) % 2:
+            fig.add_trace(go.Scattergl(x=x, y=levels[half], mode="lines",
+                                       line=dict(color="black", width=2), name=f"{quantiles[half]:.0%} of states"))
+    else:
+        raise ValueError(f"Unknown mode {mode!r}, expected 'auto', 'lines', 'webgl' or 'bands'")
 
     # Customise layout
     fig.update_layout(
-        title=f"Convergence of Piglet with target T = {res.T}",
+        title=f"Convergence of {type(res).__name__} with target T = {res.T}",
         xaxis_title="iteration",
         yaxis_title="probability",
         template="plotly_white",
     )
     return fig
 
+def plot_piglet_convergence(res: Piglet, mode: str = "auto", max_points: int = 1000):
+    """Convergence plot for Piglet
+
+    Args:
+        res (Piglet): Piglet class for getting trace of the value function
+        mode (str, optional): "lines", "webgl", "bands" or "auto", see `plot_convergence`.
+            Defaults to "auto".
+        max_points (int, optional): Budget of points per line. Defaults to 1000.
+
+    Returns:
+        fig: A plotly figure
+    """
+    return plot_convergence(res, mode=mode, max_points=max_points)
+
 def plot_pig_policy(res: Pig):
     """Optimal policy visualisationi
 
@@ -88,6 +206,120 @@ def plot_pig_policy(res: Pig):
 
     return fig
 
+class BoundaryIndex():
+    """Roll/hold frontier and reachable envelope of a solved Pig for every opponent score
+
+    Built once from the policy array, so cross sections for any opponent score j
+    are read from arrays instead of rescanning the policy.
+
+    Attributes:
+        T (int): Target score
+        border (list[np.ndarray]): For every j, the (i, k) states where the policy
+            rolls and holds (or wins) at k + 1, sorted by i and k
+        threshold (np.ndarray): threshold[i, j] smallest turn total at which the
+            policy holds, T - i if it rolls until the win
+        frontier (np.ndarray): frontier[i, j] smallest turn total of the border, -1 if none
+        envelope (np.ndarray): envelope[i, j] highest turn total reachable from the
+            border without winning, -1 if none
+        reachable (np.ndarray): reachable[i, j] if (i, j, 0) is reachable from (0, j, 0)
+
+    Args:
+        res (Pig): Pig class containing the optimal policy
+    """
+    __slots__ = ("T", "border", "threshold", "frontier", "envelope", "reachable")
+
+    def __init__(self, res: Pig):
+        T = res.T
+        offset = res.S._offset
+        # Policy codes in lexicographic order of (i, j, k)
+        codes = np.frombuffer(bytes(res._policy), dtype=np.uint8)[::-1]
+        roll_code = res.ACTIONS.index("roll")
+
+        self.T = T
+        self.threshold = np.array([res.policy.hold_thresholds(j) for j in range(T)], dtype=np.int64).T
+        self.frontier = np.full((T, T), -1, dtype=np.int64)
+        self.envelope = np.full((T, T), -1, dtype=np.int64)
+        border = []
+        for i in range(T):
+            n = T - i
+            roll = codes[offset[i]:offset[i + 1]].reshape(T, n) == roll_code
+            # Border: roll at k and hold at k + 1, where k + 1 = T - i is a win
+            hold_next = np.ones((T, n), dtype=bool)
+            hold_next[:, :-1] = ~roll[:, 1:]
+            j, k = np.nonzero(roll & hold_next)
+            border.append(np.column_stack([j, np.full_like(j, i), k]))
+
+            # Highest turn total k + r, r = 2..6, from which a hold does not win yet
+            candidate = k + np.clip(T - 2 - i - k, 0, 6) * (T - 2 - i - k >= 2)
+            frontier = np.full(T, n, dtype=np.int64)
+            envelope = np.full(T, n + 6, dtype=np.int64)
+            np.minimum.at(frontier, j, k)
+            np.minimum.at(envelope, j, candidate)
+            has_border = frontier < n
+            self.frontier[i, has_border] = frontier[has_border]
+            self.envelope[i, has_border] = envelope[has_border]
+
+        border = np.concatenate(border)
+        border = border[np.lexsort((border[:, 2], border[:, 1], border[:, 0]))]
+        splits = np.searchsorted(border[:, 0], np.arange(1, T))
+        self.border = [b[:, 1:] for b in np.split(border, splits)]
+
+        self.reachable = np.zeros((T, T), dtype=bool)
+        for j in range(T):
+            queue = deque([0])
+            while queue:
+                t = queue.popleft()
+                if t >= T or self.reachable[t, j]:
+                    continue
+                self.reachable[t, j] = True
+                t_next = t + self.threshold[t, j]
+                if self.threshold[t, j] < T - t and t_next < T:
+                    queue.extend(t_next + r for r in range(6))
+
+    def threshold_line(self, section: int) -> tuple[list, list]:
+        """Border of a section as a line
+
+        Where the policy switches more than once between rolling and holding for
+        a player score, the border has several branches. A border point continues
+        the branch with the closest turn total at the previous player score, if
+        it is within one die roll, and otherwise starts a new branch.
+
+        Args:
+            section (int): Opponent score
+
+        Returns:
+            tuple[list, list]: x and y coordinates, branches separated by None
+        """
+        branches, open_branches = [], []
+        for i, k in self.border[section].tolist():
+            candidates = [b for b in open_branches if b[-1][0] == i - 1 and abs(b[-1][1] - k) <= 6]
+            if candidates:
+                branch = min(candidates, key=lambda b: abs(b[-1][1] - k))
+                open_branches.remove(branch)
+            else:
+                branch = []
+                branches.append(branch)
+            branch.append((i, k))
+            open_branches = [b for b in open_branches if b[-1][0] >= i - 1] + [branch]
+        x, y = [], []
+        for branch in branches:
+            x += [i for i, _ in branch] + [None]
+            y += [k for _, k in branch] + [None]
+        return x, y
+
+    def reachable_section(self, section: int) -> tuple[np.ndarray, np.ndarray]:
+        """Reachable player scores of a section and the height of their envelope
+
+        Args:
+            section (int): Opponent score
+
+        Returns:
+            tuple[np.ndarray, np.ndarray]: Player scores and turn totals
+        """
+        i = np.nonzero(self.reachable[:, section] & (self.envelope[:, section] >= 0))[0]
+        return i, self.envelope[i, section]
+
+
 def get_reachable_states(res: Pig, s_initial: tuple[int, int, int] = (0, 0, 0)):
     """Obtain reachable states given a initial condition
 
@@ -122,65 +354,29 @@ def get_reachable_states(res: Pig, s_initial: tuple[int, int, int] = (0, 0, 0)):
 
     return reachable_states
 
-def plot_reachable_states(res: Pig, optimal=False):
+def plot_reachable_states(res: Pig, optimal=False, index: BoundaryIndex = None):
     """Reachable state plot
 
     Args:
         res (Pig): Pig class with all the information
         optimal (bool, optional): Flag if consider the optimal policy. Defaults to False.
+        index (BoundaryIndex, optional): Precomputed boundary index. Defaults to None (built here).
 
     Returns:
         fig: A plotly figure
     """
-    # Reachable frontier cut by the optimal policy
-    optimal_reachable_border = []
-    for point, value in res.policy.items():
-        if value == "roll":
-            neighbour = (point[0], point[1], point[2] + 1)
-            if res.policy.get(neighbour, "hold") == "hold":
-                optimal_reachable_border.append(point)
-
-    # Proper reachable frontier
-    reachable_border = []
-    for point in optimal_reachable_border:
-        best_candidate = point
-        for r in range(2, 7):  # r = 2 to 6
-            candidate = (point[0], point[1], point[2] + r)
-            if candidate[0]+candidate[2]< res.T - 1:  
-                best_candidate = candidate  # keep updating with better (larger r)
-        if best_candidate:
-            reachable_border.append(best_candidate)
-
-    # Considering the surface as a function
-    max_points = {}
-    if optimal:
-        aux_border = optimal_reachable_border
-    else:
-        aux_border = reachable_border
-
-    # Considering the surface as a function (only the minimum turn total)
-    for x, y, z in aux_border:
-        if (x, y) not in max_points or z <= max_points[(x, y)]:
-            max_points[(x, y)] = z
-
-    # Obtain reachable states, iterate over the opponent score
-    reachable_states = []
-    for j in range(res.T):
-        aux = get_reachable_states(res, s_initial=(0, j, 0))
-        reachable_states_j = [
-            (point[0], point[1], r)
-            for point in aux
-            for r in range(max_points[(point[0], point[1])])
-        ]
-        reachable_states = reachable_states + reachable_states_j
-
-    # Plot for the desire surface
-    points = np.array(reachable_states)
+    if index is None:
+        index = BoundaryIndex(res)
+
+    # Surface as a function of (i, j): reachable frontier cut by the optimal policy or proper one
+    height = index.frontier if optimal else index.envelope
+
+    # Reachable states below the surface, iterate over the opponent score
     N = res.T + 6
     grid = np.zeros((N, N, N), dtype=np.float32)
-
-    for x, y, z in points:
-        grid[x, y, z] = 1
+    x, y = np.nonzero(index.reachable & (height > 0))
+    for i, j in zip(x, y):
+        grid[i, j, :height[i, j]] = 1
 
     x, y, z = np.mgrid[0 : grid.shape[0], 0 : grid.shape[1], 0 : grid.shape[2]]
 
@@ -280,94 +476,49 @@ def plot_win_prob_contours(res:Pig, levels: tuple[float,...] =(0.03, 0.09, 0.27,
     )
     return fig
 
-def plot_cross_section(res:Pig, section: int = 30):
+def _cross_section_traces(index: BoundaryIndex, section: int) -> list:
+    # Reachable states (bars), threshold policy and hold at 20 of one section
+    reachable_x, reachable_y = index.reachable_section(section)
+    border_x, border_y = index.threshold_line(section)
+    return [
+        go.Bar(
+            x=reachable_x,
+            y=reachable_y,
+            name='Reachable states',
+            marker_color='lightblue'
+        ),
+        go.Scatter(
+            x=border_x,
+            y=border_y,
+            name='Threshold policy',
+            mode='lines',
+            line=dict(color='black', width=2),
+            marker=dict(size=6)
+        ),
+        go.Scatter(
+            x=reachable_x,
+            y=[20]*len(reachable_x),
+            mode='lines',
+            line=dict(dash='dash', color='red'),
+            name='Hold 20'  # This will appear in the legend
+        ),
+    ]
+
+def plot_cross_section(res:Pig, section: int = 30, index: BoundaryIndex = None):
     """Cross section of the reachable states and optimal policy border
 
     Args:
         res (Pig): Pig class containing the optimal policy
         section (int, optional): Opponent score section. Defaults to 30.
-    """
-    optimal_border_section = []
-    for point, value in res.policy.items():
-        if value == "roll" and point[1]==section:
-            neighbour = (point[0], point[1], point[2] + 1)
-            if res.policy.get(neighbour, "hold") == "hold":
-                optimal_border_section.append(point)
-
-    optimal_reachable_section = []
-    for point in optimal_border_section:
-        best_candidate = point
-        for r in range(2, 7):  # r = 2 to 6
-            candidate = (point[0], point[1], point[2] + r)
-            if candidate[0]+candidate[2]< res.T-1:  # your condition here
-                best_candidate = candidate  # keep updating with better (larger r)
-        if best_candidate:
-            optimal_reachable_section.append(best_candidate)
-
-    # Consider optimal border 6 points above
-    aux = get_reachable_states(res, s_initial=(0, section, 0))
-
-    # Consider the part of the border as a function
-    max_points = {}
-    for x, y, z in optimal_reachable_section:
-        if (x, y) not in max_points or z <= max_points[(x, y)]:
-            max_points[(x, y)] = z
-
-    reachable_states_section = np.array([
-                (point[0], max_points[point[0],point[1]])
-                for point in aux
-            ])
-
-    # Array for a optimal threshold section
-    array_border = np.array([(point[0],point[2]) for point in optimal_border_section]) # lineplot
-    array_border = array_border[array_border[:, 0].argsort()]
-    if section == 30:
-        min_val, max_val = 59, 74    
-        rows_indices = (array_border[:, 0] >= min_val) & (array_border[:, 0] <= max_val)
-        rows_in_range = array_border[rows_indices]
-        aux_values = np.unique(rows_in_range[:,0])
-        for v in aux_values:
-            idx = rows_in_range[:,0]==v
-            subset = rows_in_range[idx]
-            subset = subset[subset[:,1].argsort()]
-            rows_in_range[idx] = subset
-
-        rows_in_range = np.concatenate([rows_in_range[::2],rows_in_range[1::2]])
-        array_border[rows_indices] = rows_in_range
-
-    # Array of reachable states given a section
-    array_reachable_states = np.array(reachable_states_section) # barplot
-    array_reachable_states = array_reachable_states[array_reachable_states[:, 0].argsort()]
-
-    # Create figure
-    fig = go.Figure()
+        index (BoundaryIndex, optional): Precomputed boundary index. Defaults to None (built here).
 
-    # Add bar trace
-    fig.add_trace(go.Bar(
-        x=array_reachable_states[:,0],
-        y=array_reachable_states[:,1],
-        name='Reachable states',
-        marker_color='lightblue'
-    ))
-
-    # Add line trace
-    fig.add_trace(go.Scatter(
-        x=array_border[:,0],
-        y=array_border[:,1],
-        name='Threshold policy',
-        mode='lines',
-        line=dict(color='black', width=2),
-        marker=dict(size=6)
-    ))
+    Returns:
+        fig: A plotly figure
+    """
+    if index is None:
+        index = BoundaryIndex(res)
 
-    # Add horizontal dashed line at y = 50 (change this value as needed)
-    fig.add_trace(go.Scatter(
-        x=array_reachable_states[:,0],
-        y=[20]*array_reachable_states.shape[0],
-        mode='lines',
-        line=dict(dash='dash', color='red'),
-        name='Hold 20'  # This will appear in the legend
-    ))
+    fig = go.Figure(data=_cross_section_traces(index, section))
 
     # Layout
     fig.update_layout(
@@ -380,6 +531,58 @@ def plot_cross_section(res:Pig, section: int = 30):
 
     return fig
 
+def plot_cross_sections(res: Pig, sections=None, index: BoundaryIndex = None):
+    """Cross sections for every opponent score in one figure with a slider
+
+    Args:
+        res (Pig): Pig class containing the optimal policy
+        sections (iterable, optional): Opponent scores. Defaults to None (all of them).
+        index (BoundaryIndex, optional): Precomputed boundary index. Defaults to None (built here).
+
+    Returns:
+        fig: A plotly figure with one animation frame per section
+    """
+    if index is None:
+        index = BoundaryIndex(res)
+    sections = list(range(res.T)) if sections is None else list(sections)
+
+    frames = [
+        go.Frame(
+            data=_cross_section_traces(index, j),
+            name=str(j),
+            layout=dict(title=f'Cross section for the threshold policy with j={j}'),
+        )
+        for j in sections
+    ]
+
+    fig = go.Figure(data=frames[0].data, frames=frames)
+
+    animation = dict(mode='immediate', frame=dict(duration=200, redraw=True), transition=dict(duration=0))
+    fig.update_layout(
+        title=f'Cross section for the threshold policy with j={sections[0]}',
+        yaxis_title='turn total',
+        xaxis_title='player 1 score',
+        xaxis=dict(range=[-1, res.T]),
+        yaxis=dict(range=[0, max(res.T, int(index.envelope.max()) + 1)]),
+        barmode='group',
+        template='plotly_white',
+        sliders=[dict(
+            active=0,
+            currentvalue=dict(prefix='opponent score j = '),
+            steps=[dict(label=str(j), method='animate', args=[[str(j)], animation]) for j in sections],
+        )],
+        updatemenus=[dict(
+            type='buttons',
+            showactive=False,
+            buttons=[
+                dict(label='Play', method='animate', args=[None, dict(animation, fromcurrent=True)]),
+                dict(label='Pause', method='animate', args=[[None], animation]),
+            ],
+        )],
+    )
+
+    return fig
+
 ############
 # Appendix #
 ############